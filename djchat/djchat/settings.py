@@ -139,12 +139,35 @@ AUTH_USER_MODEL = "account.Account"
 
 REST_FRAMEWORK = {
     "DEFAULT_SCHEMA_CLASS": "drf_spectacular.openapi.AutoSchema",
+    # orjson based JSON rendering, the browsable API stays available for development
+    "DEFAULT_RENDERER_CLASSES": [
+        "server.renderers.ORJSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ],
     # whenever we build an endpoint or view which has or needs authentication we are just going to call upon djangos session authentication class, and thats going to help us authenticate the user, should the user be logged-in and should we need it to authenticate the user before they can access the endpoint. Hence, we need to make sure the user is logged in and serve them the data related to them.
     "DEFAULT_AUTHENTICATION_CLASSES": [
         "rest_framework.authentication.SessionAuthentication",
     ],
 }
 
+# Use Redis for the cache when REDIS_URL is set, otherwise fall back to Django's per-process in-memory cache.
+# The server app caches listings and membership ids and invalidates them from signal receivers. With the in-memory cache that invalidation only reaches the worker process that handled the write, other workers keep serving their copies until they expire, so set REDIS_URL whenever more than one worker process is running.
+REDIS_URL = os.environ.get("REDIS_URL")
+
+if REDIS_URL:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": REDIS_URL,
+        }
+    }
+else:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        }
+    }
+
 SPECTACULAR_SETTINGS = {
     "TITLE": "Your Project API",
     "DESCRIPTION": "Your project description",
@@ -0,0 +1,17 @@
+from django.db.models import Aggregate, JSONField
+
+
+class JSONArrayAgg(Aggregate):
+    """
+    Aggregate the grouped rows into a JSON array.
+    Compiles to JSON_GROUP_ARRAY on SQLite and JSONB_AGG on PostgreSQL. Returns None
+    when every row is filtered out on PostgreSQL, and "[]" on SQLite.
+    """
+
+    function = "JSON_GROUP_ARRAY"
+    output_field = JSONField()
+
+    def as_postgresql(self, compiler, connection, **extra_context):
+        return super().as_sql(
+            compiler, connection, function="JSONB_AGG", **extra_context
+        )
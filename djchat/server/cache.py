@@ -0,0 +1,47 @@
+# Cache keys and timeouts shared by the views that read cached server data and the signal receivers that invalidate it.
+
+import hashlib
+import uuid
+from urllib.parse import urlencode
+
+from django.core.cache import cache
+
+# How long (in seconds) the ids of a user's servers stay cached
+USER_SERVERS_TIMEOUT = 300
+
+# How long (in seconds) a rendered server listing stays cached
+SERVER_LIST_TIMEOUT = 60
+
+# Streamed listings larger than this (in bytes) aren't cached, so streaming keeps memory bounded
+SERVER_LIST_CACHE_MAX_BYTES = 256 * 1024
+
+SERVER_LIST_VERSION_KEY = "servers:list:version"
+
+
+def user_servers_key(user_id):
+    """Cache key holding the ids of the servers the given user is a member of."""
+    return f"servers:user:{user_id}"
+
+
+def server_list_version():
+    """
+    Return the current generation of cached server listings.
+    The generation is a random token rather than a counter, so if the key is ever
+    evicted a fresh token is picked and stale listings can't be served again.
+    """
+    return cache.get_or_set(SERVER_LIST_VERSION_KEY, lambda: uuid.uuid4().hex, None)
+
+
+def bump_server_list_version():
+    """Invalidate every cached server listing by starting a new generation."""
+    cache.set(SERVER_LIST_VERSION_KEY, uuid.uuid4().hex, None)
+
+
+def server_list_key(query_params, user_id=None):
+    """
+    Cache key for a rendered server listing.
+    Built from the sorted query parameters and, for per-user listings, the user id.
+    """
+    params = urlencode(sorted(query_params.lists()), doseq=True)
+    digest = hashlib.sha1(params.encode()).hexdigest()
+    return f"servers:list:{server_list_version()}:{user_id or ''}:{digest}"
@@ -0,0 +1,31 @@
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def populate_num_members(apps, schema_editor):
+    Server = apps.get_model("server", "Server")
+    members = (
+        Server.member.through.objects.filter(server_id=OuterRef("pk"))
+        .order_by()
+        .values("server_id")
+        .annotate(count=Count("pk"))
+        .values("count")
+    )
+    Server.objects.update(num_members=Coalesce(Subquery(members), 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("server", "0003_alter_category_name"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="server",
+            name="num_members",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(populate_num_members, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,36 @@
+import server.models
+import server.validators
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("server", "0004_server_num_members"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="server",
+            name="banner",
+            field=models.ImageField(
+                blank=True,
+                null=True,
+                upload_to=server.models.server_banner_upload_path,
+                validators=[server.validators.validate_image_file_extension],
+            ),
+        ),
+        migrations.AddField(
+            model_name="server",
+            name="icon",
+            field=models.ImageField(
+                blank=True,
+                null=True,
+                upload_to=server.models.server_icon_upload_path,
+                validators=[
+                    server.validators.validate_icon_image_size,
+                    server.validators.validate_image_file_extension,
+                ],
+            ),
+        ),
+    ]
@@ -1,7 +1,5 @@
 from django.conf import settings
 from django.db import models
-from django.dispatch import receiver
-from django.shortcuts import get_object_or_404
 
 from .validators import validate_icon_image_size, validate_image_file_extension
 
@@ -33,7 +31,9 @@ class Category(models.Model):
     Acts as a classification system for organizing servers by type/theme.
     """
 
-    name = models.CharField(max_length=100)
+    name = models.CharField(
+        max_length=100, db_index=True  # Servers are filtered by category__name
+    )
     description = models.TextField(blank=True, null=True)  # Optional description field
     icon = models.FileField(
         upload_to=category_icon_upload_path,
@@ -45,30 +45,17 @@ class Category(models.Model):
         """
         Override the default save method to handle icon file management.
         When updating an existing category with a new icon:
-        1. Retrieve the existing category
+        1. Retrieve the existing category's icon (only that column is loaded)
         2. If the icon has changed, delete the old icon file
         3. Save the new data
         This prevents orphaned files in the media directory.
         """
         if self.id:
-            existing = get_object_or_404(Category, id=self.id)
-            if existing.icon != self.icon:
+            existing = Category.objects.filter(pk=self.pk).only("icon").first()
+            if existing and existing.icon != self.icon:
                 existing.icon.delete(save=False)
         super(Category, self).save(*args, **kwargs)
 
-    @receiver(models.signals.pre_delete, sender="server.Category")
-    def category_delete_files(sender, instance, **kwargs):
-        """
-        Signal receiver that executes before a Category is deleted.
-        Ensures that when a category is deleted, its associated icon file
-        is also deleted from the file system to prevent orphaned files.
-        """
-        for field in instance._meta.fields:
-            if field.name == "icon":
-                file = getattr(instance, field.name)
-                if file:
-                    file.delete(save=False)
-
     def __str__(self):
         return self.name
 
@@ -98,6 +85,8 @@ class Server(models.Model):
         settings.AUTH_USER_MODEL,  # Creates intermediary table for server-user relationships
         # No related_name specified, so default would be server_set
     )
+    # Denormalized count of the members above, kept in sync by the m2m_changed receiver in signals.py so listings don't need a COUNT/GROUP BY
+    num_members = models.PositiveIntegerField(default=0, editable=False)
     banner = models.ImageField(
         upload_to=server_banner_upload_path,
         null=True,
@@ -116,20 +105,12 @@ class Server(models.Model):
 
     def save(self, *args, **kwargs):
         if self.id:
-            existing = get_object_or_404(Server, id=self.id)
-            if existing.icon != self.icon:
+            existing = Server.objects.filter(pk=self.pk).only("icon", "banner").first()
+            if existing and existing.icon != self.icon:
                 existing.icon.delete(save=False)
-            if existing.banner != self.banner:
+            if existing and existing.banner != self.banner:
                 existing.banner.delete(save=False)
-        super(Category, self).save(*args, **kwargs)
-
-    @receiver(models.signals.pre_delete, sender="server.Server")
-    def category_delete_files(sender, instance, **kwargs):
-        for field in instance._meta.fields:
-            if field.name == "icon" or field.name == "banner":
-                file = getattr(instance, field.name)
-                if file:
-                    file.delete(save=False)
+        super(Server, self).save(*args, **kwargs)
 
     def __str__(self):
         return f"{self.name}-{self.id}"
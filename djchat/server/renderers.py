@@ -0,0 +1,24 @@
+import orjson
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+# Types orjson doesn't handle natively (Decimal, lazy translation strings, querysets...) are handed to DRF's encoder
+encoder_default = JSONEncoder().default
+
+
+def dumps(data):
+    """Encode data to JSON bytes with orjson."""
+    return orjson.dumps(data, default=encoder_default, option=orjson.OPT_NON_STR_KEYS)
+
+
+class ORJSONRenderer(JSONRenderer):
+    """
+    JSON renderer backed by orjson, which encodes nested dicts and lists
+    several times faster than the standard library json module used by DRF.
+    Output is always compact; indentation requested by the client is ignored.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        return dumps(data)
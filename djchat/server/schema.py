@@ -21,12 +21,6 @@ server_list_docs = extend_schema(
             location=OpenApiParameter.QUERY,
             description="Number of Servers to Retrieve",
         ),
-        OpenApiParameter(
-            name="qty",
-            type=OpenApiTypes.INT,
-            location=OpenApiParameter.QUERY,
-            description="Number of Servers to Retrieve",
-        ),
         OpenApiParameter(
             name="by_user",
             type=OpenApiTypes.BOOL,
@@ -35,12 +29,24 @@ server_list_docs = extend_schema(
         ),
         OpenApiParameter(
             name="with_num_members",
-            type=OpenApiTypes.INT,
+            type=OpenApiTypes.BOOL,
             location=OpenApiParameter.QUERY,
             description="Include number of members for each server in the response",
         ),
         OpenApiParameter(
-            name="by_server_id",
+            name="counts_only",
+            type=OpenApiTypes.BOOL,
+            location=OpenApiParameter.QUERY,
+            description="With with_num_members, return only id, name, category_id and num_members per server",
+        ),
+        OpenApiParameter(
+            name="with_channels",
+            type=OpenApiTypes.BOOL,
+            location=OpenApiParameter.QUERY,
+            description="Include the channels of each server in the response",
+        ),
+        OpenApiParameter(
+            name="by_serverid",
             type=OpenApiTypes.INT,
             location=OpenApiParameter.QUERY,
             description="Include server by id",
@@ -1,3 +1,6 @@
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models.functions import JSONObject
+from drf_spectacular.utils import extend_schema_field
 from rest_framework import serializers
 
 # Sort of data to expect
@@ -10,13 +13,95 @@ class ChannelSerializer(serializers.ModelSerializer):
         fields = "__all__"
 
 
+def channel_json_object(prefix="channel_server"):
+    """
+    Database-side equivalent of ChannelSerializer: a JSONObject with one key per
+    concrete Channel field (foreign keys as their raw id), read through the given
+    relation prefix. Built from the model so new Channel fields are picked up the
+    same way fields = "__all__" picks them up.
+    """
+    return JSONObject(
+        **{
+            field.name: f"{prefix}__{field.attname}"
+            for field in Channel._meta.concrete_fields
+        }
+    )
+
+
+class SpecializedRepresentationMixin:
+    """
+    Replaces DRF's generic to_representation, which loops over the fields calling
+    get_attribute/to_representation on each one, with a function generated for the
+    serializer's exact field set that builds the output dict in a single expression.
+
+    The function is generated from the bound fields the first time an instance is
+    serialized and cached on the class, so it assumes the field set doesn't change
+    between instances. Serializers with dotted or "*" sources, and instances that
+    aren't of the serializer's model (e.g. plain dicts), fall back to DRF.
+    """
+
+    def to_representation(self, instance):
+        if not isinstance(instance, self.Meta.model):
+            return super().to_representation(instance)
+        cls = type(self)
+        specialized = cls.__dict__.get("_specialized_representation")
+        if specialized is None:
+            specialized = self.build_specialized_representation()
+            cls._specialized_representation = specialized
+        if specialized is False:
+            return super().to_representation(instance)
+        return specialized(self, instance)
+
+    def build_specialized_representation(self):
+        model = self.Meta.model
+        items = []
+        for field in self._readable_fields:
+            name, source = field.field_name, field.source
+            if not source.isidentifier() or isinstance(
+                field, serializers.ManyRelatedField
+            ):
+                return False
+            if isinstance(field, serializers.SerializerMethodField):
+                expr = f"self.{field.method_name}(obj)"
+            elif (
+                isinstance(field, serializers.PrimaryKeyRelatedField)
+                and field.pk_field is None
+            ):
+                # Read the raw foreign key column instead of loading the related object
+                try:
+                    expr = f"obj.{model._meta.get_field(source).attname}"
+                except FieldDoesNotExist:
+                    return False
+            elif type(field) is serializers.IntegerField:
+                expr = f"None if (value := obj.{source}) is None else int(value)"
+            elif type(field) is serializers.CharField:
+                expr = f"None if (value := obj.{source}) is None else str(value)"
+            else:
+                expr = (
+                    f"None if (value := obj.{source}) is None "
+                    f"else fields[{name!r}].to_representation(value)"
+                )
+            items.append(f"        {name!r}: {expr},\n")
+        source_code = (
+            "def to_representation(self, obj):\n"
+            "    fields = self.fields\n"
+            "    return {\n" + "".join(items) + "    }\n"
+        )
+        namespace = {}
+        exec(
+            compile(source_code, f"<{type(self).__name__}.to_representation>", "exec"),
+            namespace,
+        )
+        return namespace["to_representation"]
+
+
 # serializers has a ModelSerializer which enables us to utilize the model information from django to quickly create a serializer.
-class ServerSerializer(serializers.ModelSerializer):
+class ServerSerializer(SpecializedRepresentationMixin, serializers.ModelSerializer):
     # serializer method field, field class that allows you to add any custom methods to generate a field of value. We will need to pass in data, so we will also have to create an associated num_members function to handle this.
     num_members = serializers.SerializerMethodField()
 
-    # Anytime any of the queries utilize the ServerSerializer is also going to grab the Channels associated to the servers it does that because we have the foreign key key relationship between the Channel table and the Server table. And here we have utilized the same related name specified in models.py under the Channel Model. While we could use a seperate filter in views.py to retrieve associated Channels, we are consider Channels to be nothing more than a servers associated data, so why use a seperata filter. Hence, we have used a hardcode approach.
-    channel_server = ChannelSerializer(many=True)
+    # The channels are only serialized when the view passes with_channels in the context, so callers that just list servers don't pay for the channel query.
+    channel_server = serializers.SerializerMethodField()
 
     # What model we are using and fields we want serialized and sent to frontend
     class Meta:
@@ -24,10 +109,19 @@ class ServerSerializer(serializers.ModelSerializer):
         exclude = ("member",)
 
     def get_num_members(Self, obj):
-        # this num_members refers to num_members data returned from views.py queryset.
-        if hasattr(obj, "num_members"):
-            return obj.num_members
-        return None
+        # this num_members refers to the denormalized member count stored on the Server model.
+        return obj.num_members
+
+    @extend_schema_field(ChannelSerializer(many=True))
+    def get_channel_server(self, obj):
+        if not self.context.get("with_channels"):
+            return []
+        # The server list view aggregates the channels into JSON in the server query itself
+        if hasattr(obj, "channels"):
+            return obj.channels or []
+        return ChannelSerializer(
+            obj.channel_server.all(), many=True, context=self.context
+        ).data
 
     def to_representation(self, instance):
         data = super().to_representation(instance)
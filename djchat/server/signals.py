@@ -0,0 +1,161 @@
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete
+from django.dispatch import receiver
+
+from .cache import bump_server_list_version, user_servers_key
+from .models import Category, Channel, Server
+
+logger = logging.getLogger(__name__)
+
+# Signal receivers live at module level (rather than inside the model classes) so they are plain functions, and are connected exactly once from ServerConfig.ready().
+
+# Media files of deleted rows are removed on a small shared thread pool, so cascading deletes don't do one storage call after another on the request thread. The pool is kept small to avoid flooding the storage backend.
+MEDIA_DELETE_WORKERS = 3
+media_delete_executor = ThreadPoolExecutor(
+    max_workers=MEDIA_DELETE_WORKERS, thread_name_prefix="media-delete"
+)
+
+
+def log_delete_failure(future, name):
+    """Log a media file deletion that raised on the thread pool."""
+    exception = future.exception()
+    if exception is not None:
+        logger.error("Failed to delete media file %s", name, exc_info=exception)
+
+
+def delete_files_on_commit(*files):
+    """
+    Delete the given stored files once the current transaction commits.
+    Nothing is deleted if the transaction rolls back, so the rows never lose their files.
+    """
+    targets = [(file.storage, file.name) for file in files if file]
+    if not targets:
+        return
+
+    def submit():
+        for storage, name in targets:
+            future = media_delete_executor.submit(storage.delete, name)
+            future.add_done_callback(
+                lambda future, name=name: log_delete_failure(future, name)
+            )
+
+    transaction.on_commit(submit)
+
+
+@receiver(pre_delete, sender=Category)
+def category_delete_files(sender, instance, **kwargs):
+    """
+    Signal receiver that executes before a Category is deleted.
+    Ensures that when a category is deleted, its associated icon file
+    is also deleted from the file system to prevent orphaned files.
+    """
+    delete_files_on_commit(instance.icon)
+
+
+@receiver(pre_delete, sender=Server)
+def server_delete_files(sender, instance, **kwargs):
+    """
+    Signal receiver that executes before a Server is deleted.
+    Removes the server's icon and banner files from storage.
+    """
+    delete_files_on_commit(instance.icon, instance.banner)
+
+
+@receiver(m2m_changed, sender=Server.member.through)
+def server_member_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    """
+    Signal receiver that executes when server memberships change.
+    Drops the cached server ids of every user whose memberships were affected, once
+    the transaction commits so a concurrent request can't cache the pre-commit ids.
+    """
+    if action not in ("post_add", "post_remove", "pre_clear"):
+        return
+    if reverse:
+        # instance is the user whose servers changed
+        user_ids = [instance.pk]
+    elif action == "pre_clear":
+        # pk_set isn't provided on clear, so collect the members before they are removed
+        user_ids = list(instance.member.values_list("pk", flat=True))
+    else:
+        user_ids = pk_set
+    keys = [user_servers_key(user_id) for user_id in user_ids]
+    transaction.on_commit(lambda: cache.delete_many(keys))
+
+
+def refresh_num_members(server_ids):
+    """Recount the members of the given servers and store the result on each server."""
+    members = (
+        Server.member.through.objects.filter(server_id=OuterRef("pk"))
+        .order_by()
+        .values("server_id")
+        .annotate(count=Count("pk"))
+        .values("count")
+    )
+    Server.objects.filter(pk__in=server_ids).update(
+        num_members=Coalesce(Subquery(members), 0)
+    )
+
+
+@receiver(m2m_changed, sender=Server.member.through)
+def server_member_count_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    """
+    Signal receiver that keeps Server.num_members in sync with the member table.
+    Counts are recomputed rather than incremented, since pk_set on remove can
+    contain ids that were never members.
+    """
+    if not reverse:
+        # instance is the server whose members changed
+        if action in ("post_add", "post_remove", "post_clear"):
+            refresh_num_members([instance.pk])
+    elif action in ("post_add", "post_remove"):
+        # instance is a user, pk_set holds the affected servers
+        refresh_num_members(pk_set)
+    elif action == "pre_clear":
+        # pk_set isn't provided on clear, so remember the user's servers until post_clear
+        instance._cleared_server_ids = list(
+            instance.server_set.values_list("pk", flat=True)
+        )
+    elif action == "post_clear":
+        refresh_num_members(getattr(instance, "_cleared_server_ids", []))
+
+
+@receiver(pre_delete, sender=settings.AUTH_USER_MODEL)
+def member_delete_refresh_counts(sender, instance, **kwargs):
+    """
+    Signal receiver that executes before a user is deleted.
+    The delete cascade removes the user's memberships without sending m2m_changed,
+    so the affected servers are recounted, and cached data dropped, once it commits.
+    """
+    user_id = instance.pk
+    server_ids = list(instance.server_set.values_list("pk", flat=True))
+    if not server_ids:
+        return
+
+    def refresh():
+        refresh_num_members(server_ids)
+        cache.delete(user_servers_key(user_id))
+        bump_server_list_version()
+
+    transaction.on_commit(refresh)
+
+
+@receiver([post_save, post_delete], sender=Category)
+@receiver([post_save, post_delete], sender=Server)
+@receiver([post_save, post_delete], sender=Channel)
+@receiver(m2m_changed, sender=Server.member.through)
+def invalidate_server_lists(sender, **kwargs):
+    """
+    Signal receiver that drops all cached server listings when any data they are built from changes.
+    The bump waits for the transaction to commit so a concurrent request can't cache pre-commit data under the new generation.
+    """
+    # m2m_changed fires before and after every change, one bump per change is enough
+    if kwargs.get("action") in ("pre_add", "pre_remove", "pre_clear"):
+        return
+    transaction.on_commit(bump_server_list_version)
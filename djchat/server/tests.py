@@ -0,0 +1,309 @@
+import io
+import tempfile
+from concurrent.futures import Future
+from importlib import import_module
+from unittest import mock
+
+from django.apps import apps
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import SimpleTestCase, TestCase, override_settings
+from PIL import Image
+from rest_framework import serializers
+
+from .cache import user_servers_key
+from .models import Category, Channel, Server
+from .serializer import (
+    ChannelSerializer,
+    ServerSerializer,
+    SpecializedRepresentationMixin,
+)
+from .validators import validate_icon_image_size
+
+
+class ServerTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = get_user_model().objects.create_user(
+            username="alice", password="password"
+        )
+        self.other_user = get_user_model().objects.create_user(
+            username="bob", password="password"
+        )
+        self.category = Category.objects.create(name="gaming")
+        self.server = Server.objects.create(
+            name="lobby", owner=self.user, category=self.category
+        )
+
+
+class UserServersCacheTests(ServerTestCase):
+    def test_add_member_clears_cached_ids_on_commit(self):
+        key = user_servers_key(self.user.pk)
+        cache.set(key, [])
+        with self.captureOnCommitCallbacks(execute=True):
+            self.server.member.add(self.user)
+            # Still cached until the transaction commits
+            self.assertEqual(cache.get(key), [])
+        self.assertIsNone(cache.get(key))
+
+    def test_reverse_remove_clears_cached_ids(self):
+        self.server.member.add(self.user)
+        key = user_servers_key(self.user.pk)
+        cache.set(key, [self.server.pk])
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.server_set.remove(self.server)
+        self.assertIsNone(cache.get(key))
+
+    def test_clear_clears_cached_ids_of_all_members(self):
+        self.server.member.add(self.user, self.other_user)
+        keys = [user_servers_key(self.user.pk), user_servers_key(self.other_user.pk)]
+        for key in keys:
+            cache.set(key, [self.server.pk])
+        with self.captureOnCommitCallbacks(execute=True):
+            self.server.member.clear()
+        for key in keys:
+            self.assertIsNone(cache.get(key))
+
+    def test_by_user_lists_newly_joined_server(self):
+        self.client.force_login(self.user)
+        response = self.client.get("/api/server/select/?by_user=true&qty=10")
+        self.assertEqual(response.json(), [])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.server.member.add(self.user)
+
+        response = self.client.get("/api/server/select/?by_user=true&qty=10")
+        self.assertEqual([server["id"] for server in response.json()], [self.server.pk])
+
+
+class NumMembersTests(ServerTestCase):
+    def setUp(self):
+        super().setUp()
+        self.other_server = Server.objects.create(
+            name="general", owner=self.user, category=self.category
+        )
+
+    def assertNumMembers(self, server, expected):
+        server.refresh_from_db()
+        self.assertEqual(server.num_members, expected)
+
+    def test_forward_add(self):
+        self.server.member.add(self.user, self.other_user)
+        self.assertNumMembers(self.server, 2)
+        self.assertNumMembers(self.other_server, 0)
+
+    def test_forward_remove(self):
+        self.server.member.add(self.user, self.other_user)
+        self.server.member.remove(self.other_user)
+        self.assertNumMembers(self.server, 1)
+        # Removing a user who isn't a member leaves the count alone
+        self.server.member.remove(self.other_user)
+        self.assertNumMembers(self.server, 1)
+
+    def test_forward_clear(self):
+        self.server.member.add(self.user, self.other_user)
+        self.server.member.clear()
+        self.assertNumMembers(self.server, 0)
+
+    def test_reverse_add(self):
+        self.user.server_set.add(self.server, self.other_server)
+        self.other_user.server_set.add(self.server)
+        self.assertNumMembers(self.server, 2)
+        self.assertNumMembers(self.other_server, 1)
+
+    def test_reverse_remove(self):
+        self.user.server_set.add(self.server, self.other_server)
+        self.user.server_set.remove(self.server)
+        self.assertNumMembers(self.server, 0)
+        self.assertNumMembers(self.other_server, 1)
+
+    def test_reverse_clear(self):
+        self.user.server_set.add(self.server, self.other_server)
+        self.other_user.server_set.add(self.server)
+        self.user.server_set.clear()
+        self.assertNumMembers(self.server, 1)
+        self.assertNumMembers(self.other_server, 0)
+
+    def test_deleting_member_account(self):
+        self.server.member.add(self.user, self.other_user)
+        self.other_server.member.add(self.other_user)
+        url = "/api/server/select/?qty=10&with_num_members=true"
+        self.client.get(url)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.other_user.delete()
+        self.assertNumMembers(self.server, 1)
+        self.assertNumMembers(self.other_server, 0)
+        counts = {
+            server["name"]: server["num_members"]
+            for server in self.client.get(url).json()
+        }
+        self.assertEqual(counts, {"lobby": 1, "general": 0})
+
+    def test_backfill_migration(self):
+        self.server.member.add(self.user, self.other_user)
+        Server.objects.update(num_members=0)
+        migration = import_module("server.migrations.0004_server_num_members")
+        migration.populate_num_members(apps, None)
+        self.assertNumMembers(self.server, 2)
+        self.assertNumMembers(self.other_server, 0)
+
+
+class ServerListCacheTests(ServerTestCase):
+    def rename_without_signals(self, name):
+        Server.objects.filter(pk=self.server.pk).update(name=name)
+
+    def test_listing_is_cached_until_server_changes(self):
+        url = "/api/server/select/?qty=10"
+        self.assertEqual(self.client.get(url).json()[0]["name"], "lobby")
+
+        # Served from the cache while nothing signals a change
+        self.rename_without_signals("renamed")
+        self.assertEqual(self.client.get(url).json()[0]["name"], "lobby")
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.server.name = "saved"
+            self.server.save()
+        self.assertEqual(self.client.get(url).json()[0]["name"], "saved")
+
+    def test_membership_change_invalidates_listing(self):
+        url = "/api/server/select/?qty=10&with_num_members=true"
+        self.assertEqual(self.client.get(url).json()[0]["num_members"], 0)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.server.member.add(self.user)
+        self.assertEqual(self.client.get(url).json()[0]["num_members"], 1)
+
+    def get_streamed(self, url):
+        response = self.client.get(url)
+        return b"".join(response.streaming_content)
+
+    def test_streamed_listing_is_cached(self):
+        url = "/api/server/select/"
+        first = self.get_streamed(url)
+        self.rename_without_signals("renamed")
+        self.assertEqual(self.client.get(url).content, first)
+
+    def test_streamed_listing_over_size_cap_is_not_cached(self):
+        url = "/api/server/select/"
+        with mock.patch("server.views.SERVER_LIST_CACHE_MAX_BYTES", 1):
+            self.get_streamed(url)
+            self.rename_without_signals("renamed")
+            self.assertIn(b"renamed", self.get_streamed(url))
+
+
+class SynchronousExecutor:
+    """Stand-in for the media delete thread pool that runs each call inline."""
+
+    def submit(self, fn, *args):
+        future = Future()
+        try:
+            future.set_result(fn(*args))
+        except Exception as exception:
+            future.set_exception(exception)
+        return future
+
+
+class DeleteFilesTests(ServerTestCase):
+    def setUp(self):
+        super().setUp()
+        media_root = tempfile.TemporaryDirectory()
+        self.addCleanup(media_root.cleanup)
+        self.settings_override = override_settings(MEDIA_ROOT=media_root.name)
+        self.settings_override.enable()
+        self.addCleanup(self.settings_override.disable)
+        executor_patch = mock.patch(
+            "server.signals.media_delete_executor", SynchronousExecutor()
+        )
+        executor_patch.start()
+        self.addCleanup(executor_patch.stop)
+
+    def test_category_icon_deleted_after_commit(self):
+        category = Category.objects.create(
+            name="music", icon=SimpleUploadedFile("icon.png", b"icon")
+        )
+        storage, name = category.icon.storage, category.icon.name
+        self.assertTrue(storage.exists(name))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            category.delete()
+            # Kept until the transaction commits
+            self.assertTrue(storage.exists(name))
+        self.assertFalse(storage.exists(name))
+
+
+class WithChannelsTests(ServerTestCase):
+    def test_channels_match_channel_serializer(self):
+        channel = Channel.objects.create(
+            name="General", owner=self.user, topic="chat", server=self.server
+        )
+        Server.objects.create(name="empty", owner=self.user, category=self.category)
+
+        response = self.client.get("/api/server/select/?qty=10&with_channels=true")
+        channels = {
+            server["name"]: server["channel_server"] for server in response.json()
+        }
+        self.assertEqual(channels["lobby"], [ChannelSerializer(channel).data])
+        self.assertEqual(channels["empty"], [])
+
+
+class SpecializedRepresentationTests(ServerTestCase):
+    def test_matches_generic_model_serializer_output(self):
+        Channel.objects.create(
+            name="general", owner=self.user, topic="chat", server=self.server
+        )
+        self.server.member.add(self.user)
+        Server.objects.create(
+            name="described",
+            owner=self.other_user,
+            category=self.category,
+            description="about",
+        )
+        serializer = ServerSerializer(
+            context={"num_members": True, "with_channels": True}
+        )
+        for server in Server.objects.all():
+            self.assertEqual(
+                SpecializedRepresentationMixin.to_representation(serializer, server),
+                serializers.ModelSerializer.to_representation(serializer, server),
+            )
+
+
+class ValidateIconImageSizeTests(SimpleTestCase):
+    def make_png(self, width, height):
+        buffer = io.BytesIO()
+        Image.new("RGB", (width, height)).save(buffer, "PNG")
+        return SimpleUploadedFile("icon.png", buffer.getvalue())
+
+    def test_accepts_small_icon_and_rewinds(self):
+        icon = self.make_png(70, 70)
+        validate_icon_image_size(icon)
+        self.assertEqual(icon.tell(), 0)
+
+    def test_rejects_large_dimensions(self):
+        with self.assertRaises(ValidationError):
+            validate_icon_image_size(self.make_png(300, 300))
+
+    def test_rejects_unidentifiable_file(self):
+        svg = SimpleUploadedFile("icon.svg", b"<svg></svg>" + b" " * 100_000)
+        with self.assertRaises(ValidationError):
+            validate_icon_image_size(svg)
+
+    def test_rejects_oversized_file(self):
+        with self.assertRaises(ValidationError):
+            validate_icon_image_size(
+                SimpleUploadedFile("icon.png", b"0" * (2 * 1024 * 1024))
+            )
+
+
+class ServerListParamsTests(ServerTestCase):
+    def test_invalid_qty_is_rejected(self):
+        for qty in ("abc", "-1"):
+            response = self.client.get(f"/api/server/select/?qty={qty}")
+            self.assertEqual(response.status_code, 400)
+
+    def test_qty_limits_results(self):
+        Server.objects.create(name="general", owner=self.user, category=self.category)
+        response = self.client.get("/api/server/select/?qty=1")
+        self.assertEqual(len(response.json()), 1)
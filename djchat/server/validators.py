@@ -1,18 +1,44 @@
 import os
 
 from django.core.exceptions import ValidationError
-from PIL import Image
+from PIL import Image, ImageFile, UnidentifiedImageError
+
+# Upper bound on an icon upload in bytes. Anything larger can't be a 200x200 icon worth keeping, so it is rejected before PIL reads the file.
+ICON_MAX_BYTES = 1024 * 1024
+
+# Bytes of the upload handed to the header parser
+ICON_HEADER_BYTES = 8192
+
+# Built once at import time, frozenset gives constant-time membership checks
+VALID_EXTENSIONS = frozenset((".jpg", ".jpeg", ".png", ".gif", ".svg"))
 
 
 def validate_icon_image_size(image):
     if image:
-        with Image.open(image) as img:
-            if img.width > 200 or img.height > 200:
-                raise ValidationError(f"Image size too big, please upload 70x70")
+        if image.size > ICON_MAX_BYTES:
+            raise ValidationError(
+                f"Image file too large, icons must be at most {ICON_MAX_BYTES // 1024} KB"
+            )
+        # Parse the dimensions from a single bounded prefix of the file, which holds the header of nearly every icon.
+        parser = ImageFile.Parser()
+        image.seek(0)
+        try:
+            parser.feed(image.read(ICON_HEADER_BYTES))
+            img = parser.image
+            if img is None:
+                # Header larger than the prefix (e.g. big EXIF blocks) or not an image at all, let Image.open read just the header
+                image.seek(0)
+                try:
+                    img = Image.open(image)
+                except UnidentifiedImageError:
+                    raise ValidationError("Unsupported image file")
+        finally:
+            image.seek(0)
+        if img.width > 200 or img.height > 200:
+            raise ValidationError(f"Image size too big, please upload 70x70")
 
 
 def validate_image_file_extension(value):
     ext = os.path.splitext(value.name)[1]
-    valid_extensions = [".jpg", ".svg", ".png", ".jpeg", ".gif"]
-    if not ext.lower() in valid_extensions:
+    if ext.lower() not in VALID_EXTENSIONS:
         raise ValidationError("Unsupported file extension")
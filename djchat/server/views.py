@@ -1,12 +1,54 @@
-from django.db.models import Count
+from django.core.cache import cache
+from django.db.models import Q
+from django.http import HttpResponse, StreamingHttpResponse
 from django.shortcuts import render
 from rest_framework import viewsets
 from rest_framework.exceptions import AuthenticationFailed, ValidationError
-from rest_framework.response import Response
 
+from .aggregates import JSONArrayAgg
+from .cache import (
+    SERVER_LIST_CACHE_MAX_BYTES,
+    SERVER_LIST_TIMEOUT,
+    USER_SERVERS_TIMEOUT,
+    server_list_key,
+    user_servers_key,
+)
 from .models import Server
+from .renderers import dumps
 from .schema import server_list_docs
-from .serializer import ServerSerializer
+from .serializer import ServerSerializer, channel_json_object
+
+# Number of servers fetched per database round trip when streaming an uncapped listing
+STREAM_CHUNK_SIZE = 200
+
+
+def stream_json_array(items):
+    """Encode an iterable of serialized items as a JSON array, one item at a time."""
+    yield b"["
+    for index, item in enumerate(items):
+        if index:
+            yield b","
+        yield dumps(item)
+    yield b"]"
+
+
+def cache_stream(chunks, key):
+    """
+    Pass streamed chunks through and cache the full body once the stream has been sent.
+    Bodies over SERVER_LIST_CACHE_MAX_BYTES stop being buffered and aren't cached.
+    """
+    parts = []
+    size = 0
+    for chunk in chunks:
+        if parts is not None:
+            size += len(chunk)
+            if size > SERVER_LIST_CACHE_MAX_BYTES:
+                parts = None
+            else:
+                parts.append(chunk)
+        yield chunk
+    if parts is not None:
+        cache.set(key, b"".join(parts), SERVER_LIST_TIMEOUT)
 
 
 class ServerListViewSet(viewsets.ViewSet):
@@ -32,7 +74,8 @@ class ServerListViewSet(viewsets.ViewSet):
 
         by_user (bool, optional):
             If "true", returns only servers where the authenticated user is a member.
-            Requires authentication.
+            Requires authentication. The ids of the user's servers are cached and
+            invalidated whenever the user's memberships change.
             Example: ?by_user=true
 
         by_serverid (int, optional):
@@ -41,17 +84,33 @@ class ServerListViewSet(viewsets.ViewSet):
 
         with_num_members (bool, optional):
             If "true", includes a count of members for each server in the response.
+            The count is read from the denormalized Server.num_members column.
             Example: ?with_num_members=true
 
+        counts_only (bool, optional):
+            Used together with with_num_members. If "true", returns only the id, name,
+            category_id and num_members of each server, skipping the nested channels.
+            Example: ?with_num_members=true&counts_only=true
+
+        with_channels (bool, optional):
+            If "true", includes the channels of each server in channel_server. Otherwise
+            channel_server is an empty list and no channels are queried.
+            Example: ?with_channels=true
+
     Returns:
-        REST framework Response containing serialized server data.
+        A JSON HttpResponse (a StreamingHttpResponse for listings without qty or
+        by_serverid) containing the serialized server data, encoded with orjson.
         The response format will be a list of server objects with their respective fields.
+        The body is built directly instead of going through a REST framework Response,
+        so it can be cached as is. DRF content negotiation is therefore skipped: this
+        endpoint always returns JSON and the browsable API (?format=api) isn't available.
 
     Raises:
         AuthenticationFailed:
             When by_user=true is specified but the user is not authenticated.
         ValidationError:
-            When by_serverid is specified but the server doesn't exist or the ID is invalid.
+            When by_serverid is specified but the server doesn't exist or the ID is invalid,
+            or when qty isn't a non-negative integer.
 
     Example Usage:
         # Get all servers in the 'gaming' category with member counts
@@ -63,12 +122,25 @@ class ServerListViewSet(viewsets.ViewSet):
     Notes:
         - Multiple query parameters can be combined to create complex filters
         - The endpoint is optimized to handle multiple filtering scenarios efficiently
-        - All filters are applied sequentially to the base queryset
+        - All filters are applied sequentially to a per-request copy of the base queryset
         - The serializer handles the final formatting of the response data
+        - Listings without qty or by_serverid are streamed as a JSON array
+        - Rendered listings are cached per query string (and user, for by_user) and
+          invalidated whenever a category, server, channel or membership changes
     """
 
+    # category and owner are serialized as primary keys read from category_id/owner_id, so no joins are needed. Channels are only added in list() when the client asks for them.
     queryset = Server.objects.all()
 
+    def get_queryset(self):
+        """
+        Return a fresh copy of the base queryset for the current request.
+
+        Calling .all() clones the class level queryset, so filters applied while
+        handling one request never leak into the next one served by the same worker.
+        """
+        return self.queryset.all()
+
     @server_list_docs
     def list(self, request):
         """
@@ -79,7 +151,7 @@ class ServerListViewSet(viewsets.ViewSet):
                              for filtering and customizing the response.
 
         Returns:
-            Response: Serialized server data based on applied filters
+            HttpResponse | StreamingHttpResponse: JSON server data based on applied filters
                      Format: [
                          {
                              "id": int,
@@ -93,7 +165,7 @@ class ServerListViewSet(viewsets.ViewSet):
 
         Raises:
             AuthenticationFailed: If by_user=true and user is not authenticated
-            ValidationError: If by_serverid is invalid or server doesn't exist
+            ValidationError: If by_serverid or qty is invalid, or the server doesn't exist
         """
         # Extract query parameters from the request
         category = request.query_params.get("category")
@@ -101,50 +173,115 @@ class ServerListViewSet(viewsets.ViewSet):
         by_user = request.query_params.get("by_user") == "true"
         by_serverid = request.query_params.get("by_serverid")
         with_num_members = request.query_params.get("with_num_members") == "true"
+        counts_only = (
+            with_num_members and request.query_params.get("counts_only") == "true"
+        )
+        with_channels = request.query_params.get("with_channels") == "true"
+
+        # Validate the quantity limit up front so a bad value is a 400, not a 500 from the slice
+        if qty:
+            try:
+                limit = int(qty)
+            except ValueError:
+                limit = -1
+            if limit < 0:
+                raise ValidationError(
+                    detail=f"qty must be a non-negative integer, got {qty}"
+                )
+
+        # Serve the rendered listing from the cache when possible, skipping the ORM and the serializers entirely
+        cache_key = server_list_key(
+            request.query_params, request.user.id if by_user else None
+        )
+        body = cache.get(cache_key)
+        if body is not None and (not by_user or request.user.is_authenticated):
+            return HttpResponse(body, content_type="application/json")
 
         # Authentication check for user-specific queries
         # if by_user and not request.user.is_authenticated:
         # raise AuthenticationFailed()
 
+        # Work on a per-request queryset rather than mutating the class attribute
+        qs = self.get_queryset()
+
         # Apply category filter if specified
         if category:
-            self.queryset = self.queryset.filter(category__name=category)
+            qs = qs.filter(category__name=category)
 
         # Filter by user membership if requested
         if by_user:
             if by_user and request.user.is_authenticated:
                 # utilizing default session authentication setup in settings.py^^^
                 user_id = request.user.id
-                self.queryset = self.queryset.filter(member=user_id)
+                # Look up the user's server ids in the cache and filter by primary key, which avoids joining the membership table on every request
+                key = user_servers_key(user_id)
+                server_ids = cache.get(key)
+                if server_ids is None:
+                    # Read the ids straight from the membership table, no join against servers and no duplicate rows to deduplicate
+                    server_ids = list(
+                        Server.member.through.objects.filter(
+                            account_id=user_id
+                        ).values_list("server_id", flat=True)
+                    )
+                    cache.set(key, server_ids, USER_SERVERS_TIMEOUT)
+                qs = qs.filter(id__in=server_ids)
             else:
                 raise AuthenticationFailed()
 
-        # Add member count annotation if requested
-        if with_num_members:
-            self.queryset = self.queryset.annotate(num_members=Count("member"))
-
-        # Apply quantity limit if specified
-        if qty:
-            self.queryset = self.queryset[: int(qty)]
-
         # Filter by specific server ID if requested
         if by_serverid:
             try:
-                self.queryset = self.queryset.filter(id=by_serverid)
-                # Raise validation error if server doesn't exist
-                if not self.queryset.exists():
-                    raise ValidationError(
-                        detail=f"Server with ID {by_serverid} does not exist"
-                    )
+                server_id = int(by_serverid)
             except ValueError:
                 # Handle case where by_serverid is not a valid integer
                 raise ValidationError(
                     detail=f"Server with ID {by_serverid} does not exist"
                 )
+            qs = qs.filter(id=server_id)
 
-        # Serialize the filtered queryset
-        serializer = ServerSerializer(
-            self.queryset, many=True, context={"num_members": with_num_members}
-        )
+        # For counts only, fetch plain rows from the database so the serializers don't run
+        if counts_only:
+            qs = qs.values("id", "name", "category_id", "num_members")
+        elif with_channels:
+            # Let the database build each server's channels as a JSON array in the same query, instead of a second query joined up in Python
+            qs = qs.annotate(
+                channels=JSONArrayAgg(
+                    channel_json_object(), filter=Q(channel_server__isnull=False)
+                )
+            )
+
+        # Apply quantity limit last: the slice becomes a SQL LIMIT, so only the requested servers are read and have their channels aggregated. A sliced queryset can't be filtered any further.
+        if qty:
+            qs = qs[:limit]
+
+        context = {"num_members": with_num_members, "with_channels": with_channels}
+
+        # Without a qty limit the listing is unbounded, so stream it: rows are fetched in chunks and serialized one server at a time instead of materializing the whole result set in memory
+        if not qty and not by_serverid:
+            rows = qs.iterator(chunk_size=STREAM_CHUNK_SIZE)
+            if not counts_only:
+                # One serializer for every row, its fields are built once and reused
+                child = ServerSerializer(context=context)
+                rows = (child.to_representation(server) for server in rows)
+            return StreamingHttpResponse(
+                cache_stream(stream_json_array(rows), cache_key),
+                content_type="application/json",
+            )
+
+        # Evaluate the queryset once; the existence check below reuses the fetched rows instead of issuing a separate EXISTS query
+        servers = list(qs)
+
+        # Raise validation error if the requested server doesn't exist
+        if by_serverid and not servers:
+            raise ValidationError(detail=f"Server with ID {by_serverid} does not exist")
+
+        if counts_only:
+            data = servers
+        else:
+            # Serialize the filtered servers
+            data = ServerSerializer(servers, many=True, context=context).data
+
+        body = dumps(data)
+        cache.set(cache_key, body, SERVER_LIST_TIMEOUT)
 
-        return Response(serializer.data)
+        return HttpResponse(body, content_type="application/json")